@@ -1,6 +1,7 @@
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import FilterSet, filters
 
-from recipes.models import Ingredient, Recipe
+from recipes.models import FavoriteRecipe, Ingredient, Recipe, ShoppingCart
 
 
 class IngredientFilter(FilterSet):
@@ -23,12 +24,22 @@ class RecipeFilter(FilterSet):
         fields = ["author", "is_favorited", "is_in_shopping_cart"]
 
     def filter_is_favorited(self, queryset, name, value, *args, **kwargs):
-        if value and self.request and self.request.user.is_authenticated:
-            return queryset.filter(favorited_by__user=self.request.user)
+        user = self.request.user if self.request else None
+        if value and user and user.is_authenticated:
+            return queryset.filter(Exists(
+                FavoriteRecipe.objects.filter(
+                    user=user, recipe=OuterRef("pk")
+                )
+            ))
         return queryset
 
     def filter_is_in_shopping_cart(self, queryset, name, value,
                                    *args, **kwargs):
-        if value and self.request and self.request.user.is_authenticated:
-            return queryset.filter(in_shopping_carts__user=self.request.user)
+        user = self.request.user if self.request else None
+        if value and user and user.is_authenticated:
+            return queryset.filter(Exists(
+                ShoppingCart.objects.filter(
+                    user=user, recipe=OuterRef("pk")
+                )
+            ))
         return queryset
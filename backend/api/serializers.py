@@ -1,4 +1,13 @@
-import base64
+import binascii
+import re
+from io import BytesIO
+
+try:
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
+from PIL import Image
 from django.core.files.base import ContentFile
 from django.db import transaction
 from rest_framework import serializers
@@ -6,13 +15,36 @@ from djoser.serializers import UserSerializer
 from recipes.models import Ingredient, RecipeIngredient, Recipe
 from users.models import User, Subscription
 
+AVATAR_MAX_DIMENSION = 512
+
+
+DATA_URL_PATTERN = re.compile(
+    r"^data:image/(?P<ext>[\w.+-]+);base64,(?P<data>.*)$", re.DOTALL
+)
+
+
+def build_image_url(request, image):
+    """Абсолютный URL изображения для ответа API"""
+    if image and request:
+        return request.build_absolute_uri(image.url)
+    return None
+
 
 class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith("data:image"):
-            format, imgstr = data.split(";base64,")
-            ext = format.split("/")[-1]
-            data = ContentFile(base64.b64decode(imgstr), name="temp." + ext)
+            match = DATA_URL_PATTERN.match(data)
+            if match is None:
+                raise serializers.ValidationError(
+                    "Некорректные base64-данные изображения"
+                )
+            try:
+                decoded = b64decode(match["data"])
+            except (binascii.Error, ValueError):
+                raise serializers.ValidationError(
+                    "Некорректные base64-данные изображения"
+                )
+            data = ContentFile(decoded, name="temp." + match["ext"])
         return super().to_internal_value(data)
 
 
@@ -23,6 +55,18 @@ class AvatarUpdateSerializer(serializers.ModelSerializer):
         model = User
         fields = ('avatar',)
 
+    def validate_avatar(self, avatar):
+        avatar.seek(0)
+        image = Image.open(avatar)
+        if max(image.size) <= AVATAR_MAX_DIMENSION:
+            avatar.seek(0)
+            return avatar
+        image_format = image.format or "PNG"
+        image.thumbnail((AVATAR_MAX_DIMENSION, AVATAR_MAX_DIMENSION))
+        buffer = BytesIO()
+        image.save(buffer, format=image_format)
+        return ContentFile(buffer.getvalue(), name=avatar.name)
+
 
 class UserMeSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
@@ -90,23 +134,25 @@ class UserProfileSerializer(UserSerializer):
         }
 
     def get_is_subscribed(self, user_profile):
+        annotated = getattr(user_profile, "is_subscribed", None)
+        if annotated is not None:
+            return bool(annotated)
         request = self.context.get("request")
-        return (
-            request is not None
-            and request.user.is_authenticated
-            and Subscription.objects.filter(
-                user=request.user,
-                author=user_profile
-            ).exists()
-        )
+        if request is None or not request.user.is_authenticated:
+            return False
+        if "subscribed_author_ids" not in self.context:
+            self.context["subscribed_author_ids"] = set(
+                Subscription.objects.filter(
+                    user=request.user
+                ).values_list("author_id", flat=True)
+            )
+        return user_profile.id in self.context["subscribed_author_ids"]
 
 
 class UserWithRecipesSerializer(UserProfileSerializer):
     """Сериализатор для пользователя с его рецептами"""
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.IntegerField(
-        source="recipes.count", read_only=True
-    )
+    recipes_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta(UserProfileSerializer.Meta):
         fields = (
@@ -117,13 +163,17 @@ class UserWithRecipesSerializer(UserProfileSerializer):
 
     def get_recipes(self, user_obj):
         request = self.context.get("request")
-        recipes_limit = request.GET.get("recipes_limit") if request else None
-        queryset = user_obj.recipes.all()
-        if recipes_limit:
-            try:
-                queryset = queryset[:int(recipes_limit)]
-            except ValueError:
-                pass
+        queryset = getattr(user_obj, "limited_recipes", None)
+        if queryset is None:
+            recipes_limit = (
+                request.GET.get("recipes_limit") if request else None
+            )
+            queryset = user_obj.recipes.order_by("-id")
+            if recipes_limit:
+                try:
+                    queryset = queryset[:int(recipes_limit)]
+                except ValueError:
+                    pass
         return RecipeShortSerializer(
             queryset,
             many=True,
@@ -148,10 +198,7 @@ class RecipeShortSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_image(self, obj):
-        request = self.context.get("request")
-        if obj.image and request:
-            return request.build_absolute_uri(obj.image.url)
-        return None
+        return build_image_url(self.context.get("request"), obj.image)
 
 
 class RecipeIngredientReadSerializer(serializers.ModelSerializer):
@@ -169,10 +216,7 @@ class RecipeIngredientReadSerializer(serializers.ModelSerializer):
 
 class RecipeIngredientWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для записи ингредиентов в рецепте"""
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all(),
-        source="ingredient",
-    )
+    id = serializers.IntegerField(min_value=1)
     amount = serializers.IntegerField(
         min_value=1,
         error_messages={"min_value": "Количество не может быть меньше 1"}
@@ -190,8 +234,10 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         many=True,
         source="recipe_ingredients"
     )
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
+    is_favorited = serializers.BooleanField(read_only=True, default=False)
+    is_in_shopping_cart = serializers.BooleanField(
+        read_only=True, default=False
+    )
     image = serializers.SerializerMethodField()
 
     class Meta:
@@ -210,31 +256,14 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_image(self, obj):
-        request = self.context.get("request")
-        if obj.image and request:
-            return request.build_absolute_uri(obj.image.url)
-        return None
-
-    def _check_relation(self, obj, relation_name):
-        request = self.context.get('request')
-        return (
-            request
-            and request.user.is_authenticated
-            and getattr(obj, relation_name).filter(user=request.user).exists()
-        )
-
-    def get_is_favorited(self, obj):
-        return self._check_relation(obj, "favorited_by")
-
-    def get_is_in_shopping_cart(self, obj):
-        return self._check_relation(obj, "in_shopping_carts")
+        return build_image_url(self.context.get("request"), obj.image)
 
 
 class RecipeWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для создания/обновления рецепта"""
     ingredients = RecipeIngredientWriteSerializer(many=True, allow_empty=False)
     image = Base64ImageField(required=True)
-    cooking_time = serializers.IntegerField(min_value=1)
+    cooking_time = serializers.IntegerField(min_value=1, max_value=32000)
 
     class Meta:
         model = Recipe
@@ -252,22 +281,26 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
                 "Требуется хотя бы один ингредиент"
             )
 
-        ingredient_ids = [item["ingredient"].id for item in ingredients_data]
+        ingredient_ids = [item["id"] for item in ingredients_data]
 
-        if len(ingredient_ids) != len(set(ingredient_ids)):
-            raise serializers.ValidationError(
-                "Ингредиенты не должны повторяться"
-            )
+        seen_ids = set()
+        for ingredient_id in ingredient_ids:
+            if ingredient_id in seen_ids:
+                raise serializers.ValidationError(
+                    "Ингредиенты не должны повторяться"
+                )
+            seen_ids.add(ingredient_id)
 
-        existing_ids = Ingredient.objects.filter(
-            id__in=ingredient_ids
-        ).values_list('id', flat=True)
-        missing_ids = set(ingredient_ids) - set(existing_ids)
+        ingredients = Ingredient.objects.in_bulk(ingredient_ids)
+        missing_ids = set(ingredient_ids) - set(ingredients)
         if missing_ids:
             raise serializers.ValidationError(
                 f"Ингредиенты с ID {missing_ids} не существуют"
             )
 
+        for item in ingredients_data:
+            item["ingredient"] = ingredients[item["id"]]
+
         return ingredients_data
 
     @transaction.atomic
@@ -279,7 +312,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
                 amount=ingredient_data["amount"],
             )
             for ingredient_data in ingredients_data
-        ])
+        ], batch_size=500)
 
     def validate(self, attrs):
         request = self.context.get("request")
@@ -300,6 +333,36 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         self._create_ingredients(recipe, ingredients_data)
         return recipe
 
+    @transaction.atomic
+    def _update_ingredients(self, recipe, ingredients_data):
+        desired_amounts = {
+            item["id"]: item["amount"] for item in ingredients_data
+        }
+        existing = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in recipe.recipe_ingredients.all()
+        }
+
+        removed_ids = set(existing) - set(desired_amounts)
+        if removed_ids:
+            recipe.recipe_ingredients.filter(
+                ingredient_id__in=removed_ids
+            ).delete()
+
+        changed = []
+        for ingredient_id, recipe_ingredient in existing.items():
+            new_amount = desired_amounts.get(ingredient_id)
+            if new_amount is None or recipe_ingredient.amount == new_amount:
+                continue
+            recipe_ingredient.amount = new_amount
+            changed.append(recipe_ingredient)
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ["amount"])
+
+        self._create_ingredients(recipe, [
+            item for item in ingredients_data if item["id"] not in existing
+        ])
+
     @transaction.atomic
     def update(self, instance, validated_data):
         ingredients_data = validated_data.pop("ingredients", None)
@@ -307,8 +370,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         instance = super().update(instance, validated_data)
 
         if ingredients_data is not None:
-            instance.ingredients.clear()
-            self._create_ingredients(instance, ingredients_data)
+            self._update_ingredients(instance, ingredients_data)
         return instance
 
     def to_representation(self, instance):
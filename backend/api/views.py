@@ -1,19 +1,26 @@
 from rest_framework import viewsets, status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from django.core.files.base import ContentFile
 from djoser.views import UserViewSet as DjoserUserViewSet
-from django.db.models import Sum
-import base64
-import uuid
-from django.http import HttpResponse
+from django.db import IntegrityError
+from django.db.models import Count, Exists, OuterRef, Prefetch, Sum
+from django.http import StreamingHttpResponse
+import time
 
 from users.models import User, Subscription
-from recipes.models import Recipe, Ingredient, FavoriteRecipe, ShoppingCart
+from recipes.models import (
+    Recipe,
+    RecipeIngredient,
+    Ingredient,
+    FavoriteRecipe,
+    ShoppingCart,
+)
 from .serializers import (
+    AvatarUpdateSerializer,
     RecipeReadSerializer,
     RecipeWriteSerializer,
     RecipeShortSerializer,
@@ -27,6 +34,10 @@ from .permissions import IsAuthorOrReadOnly
 from .pagination import SitePagination
 
 
+SHOPPING_LIST_HEADER = "Список покупок от {date}:\n"
+SHOPPING_LIST_DISPOSITION = 'attachment; filename="shopping_list.txt"'
+
+
 class BaseRecipeRelationView:
     """Базовый класс для обработки связей пользователь-рецепт"""
     @action(
@@ -36,17 +47,18 @@ class BaseRecipeRelationView:
     )
     def handle_relation(self, request, pk, relation_model, exists_msg,
                         not_found_msg):
-        recipe = get_object_or_404(Recipe, pk=pk)
         user = request.user
-        relation = relation_model.objects.filter(user=user, recipe=recipe)
 
         if request.method == "POST":
-            if relation.exists():
+            recipe = get_object_or_404(Recipe, pk=pk)
+            _, created = relation_model.objects.get_or_create(
+                user=user, recipe=recipe
+            )
+            if not created:
                 return Response(
                     {"errors": exists_msg},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            relation_model.objects.create(user=user, recipe=recipe)
             serializer = RecipeShortSerializer(
                 recipe,
                 context={"request": request}
@@ -54,12 +66,16 @@ class BaseRecipeRelationView:
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         if request.method == "DELETE":
-            if not relation.exists():
+            deleted, _ = relation_model.objects.filter(
+                user=user, recipe_id=pk
+            ).delete()
+            if not deleted:
+                if not Recipe.objects.filter(pk=pk).exists():
+                    raise NotFound("Рецепт не найден")
                 return Response(
                     {"errors": not_found_msg},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            relation.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -72,6 +88,12 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [AllowAny]
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(
+            list(queryset.values("id", "name", "measurement_unit"))
+        )
+
     def destroy(self, request, *args, **kwargs):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -84,6 +106,30 @@ class RecipeViewSet(viewsets.ModelViewSet, BaseRecipeRelationView):
     filterset_class = RecipeFilter
     permission_classes = [IsAuthorOrReadOnly]
 
+    def get_queryset(self):
+        queryset = Recipe.objects.select_related("author").prefetch_related(
+            "recipe_ingredients__ingredient"
+        ).only(
+            "name", "image", "text", "cooking_time",
+            "author__email", "author__username",
+            "author__first_name", "author__last_name", "author__avatar",
+        ).order_by("-id")
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_favorited=Exists(
+                    FavoriteRecipe.objects.filter(
+                        user=user, recipe=OuterRef("pk")
+                    )
+                ),
+                is_in_shopping_cart=Exists(
+                    ShoppingCart.objects.filter(
+                        user=user, recipe=OuterRef("pk")
+                    )
+                ),
+            )
+        return queryset
+
     def get_serializer_class(self):
         if self.action in ["list", "retrieve"]:
             return RecipeReadSerializer
@@ -94,9 +140,10 @@ class RecipeViewSet(viewsets.ModelViewSet, BaseRecipeRelationView):
 
     @action(methods=["get"], detail=True, url_path="get-link")
     def get_link_to_recipe(self, request, pk):
-        recipe = get_object_or_404(Recipe, pk=pk)
+        if not Recipe.objects.filter(pk=pk).exists():
+            raise NotFound("Рецепт не найден")
         return Response({
-            "short-link": f"{request.get_host()}/s/{recipe.id}"
+            "short-link": f"{request.get_host()}/s/{pk}"
         })
 
     @action(
@@ -130,30 +177,31 @@ class RecipeViewSet(viewsets.ModelViewSet, BaseRecipeRelationView):
     )
     def download_shopping_cart(self, request):
         ingredients = (
-            ShoppingCart.objects
-            .filter(user=request.user)
-            .values(
-                'recipe__ingredients__name',
-                'recipe__ingredients__measurement_unit'
-            )
-            .annotate(total=Sum('recipe__recipe_ingredients__amount')))
-        if not ingredients:
+            RecipeIngredient.objects
+            .filter(recipe__in_shopping_carts__user=request.user)
+            .values('ingredient__name', 'ingredient__measurement_unit')
+            .annotate(total=Sum('amount'))
+            .order_by('ingredient__name'))
+        if not ingredients.exists():
             return Response(
                 {"errors": "Список покупок пуст"},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        content = ["Список покупок:\n"]
-        for item in ingredients:
-            name = item['recipe__ingredients__name']
-            unit = item['recipe__ingredients__measurement_unit']
-            amount = item['total']
-            content.append(f"- {name} ({unit}): {amount}")
 
-        text_data = "\n".join(content)
+        def generate_lines():
+            yield SHOPPING_LIST_HEADER.format(
+                date=time.strftime("%d.%m.%Y", time.gmtime())
+            )
+            for item in ingredients.iterator(chunk_size=200):
+                name = item['ingredient__name']
+                unit = item['ingredient__measurement_unit']
+                amount = item['total']
+                yield f"\n- {name} ({unit}): {amount}"
 
-        response = HttpResponse(text_data, content_type='text/plain')
-        response[
-            'Content-Disposition'] = 'attachment; filename="shopping_list.txt"'
+        response = StreamingHttpResponse(
+            generate_lines(), content_type='text/plain'
+        )
+        response['Content-Disposition'] = SHOPPING_LIST_DISPOSITION
         return response
 
 
@@ -163,6 +211,19 @@ class UserViewSet(DjoserUserViewSet):
     pagination_class = SitePagination
     permission_classes = [AllowAny]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                is_subscribed=Exists(
+                    Subscription.objects.filter(
+                        user=user, author=OuterRef("pk")
+                    )
+                )
+            )
+        return queryset
+
     def get_serializer_class(self):
         if self.action == "create":
             return CustomUserCreateSerializer
@@ -181,42 +242,22 @@ class UserViewSet(DjoserUserViewSet):
     def avatar(self, request):
         user = request.user
         if request.method == "PUT":
-            if 'avatar' not in request.data:
-                return Response(
-                    {"avatar": ["Это поле обязательно."]},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            try:
-                avatar_data = request.data['avatar']
-                format, imgstr = avatar_data.split(';base64,')
-                ext = format.split('/')[-1]
-
-                if user.avatar:
-                    user.avatar.delete()
-
-                user.avatar.save(
-                    f"{uuid.uuid4()}.{ext}",
-                    ContentFile(base64.b64decode(imgstr)),
-                    save=True
-                )
-                return Response(
-                    {"avatar": user.avatar.url},
-                    status=status.HTTP_200_OK
-                )
-            except Exception as e:
-                return Response(
-                    {"error": str(e)},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            serializer = AvatarUpdateSerializer(user, data=request.data)
+            serializer.is_valid(raise_exception=True)
+            if user.avatar:
+                user.avatar.delete(save=False)
+            serializer.save()
+            return Response(
+                {"avatar": user.avatar.url},
+                status=status.HTTP_200_OK
+            )
         elif request.method == "DELETE":
             if not user.avatar:
                 return Response(
                     {"detail": "Аватар отсутствует."},
                     status=status.HTTP_404_NOT_FOUND
                 )
-            user.avatar.delete()
-            user.save()
+            user.avatar.delete(save=True)
             return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=['get'],
@@ -235,9 +276,24 @@ class UserViewSet(DjoserUserViewSet):
         pagination_class=SitePagination
     )
     def subscriptions(self, request):
+        recipes_queryset = Recipe.objects.only(
+            "id", "name", "image", "cooking_time", "author_id"
+        ).order_by("-id")
+        recipes_limit = request.query_params.get("recipes_limit")
+        if recipes_limit:
+            try:
+                limit = int(recipes_limit)
+            except ValueError:
+                limit = None
+            if limit is not None and limit >= 0:
+                recipes_queryset = recipes_queryset[:limit]
         subscribed_users = User.objects.filter(
             authors__user=request.user
-        ).prefetch_related('recipes')
+        ).annotate(
+            recipes_count=Count("recipes")
+        ).prefetch_related(Prefetch(
+            "recipes", queryset=recipes_queryset, to_attr="limited_recipes"
+        )).order_by("username")
         page = self.paginate_queryset(subscribed_users)
         serializer = self.get_serializer(page, many=True)
         return self.get_paginated_response(serializer.data)
@@ -248,7 +304,9 @@ class UserViewSet(DjoserUserViewSet):
         permission_classes=[IsAuthenticated]
     )
     def subscribe(self, request, id=None):
-        author = get_object_or_404(User, id=id)
+        author = get_object_or_404(
+            User.objects.annotate(recipes_count=Count("recipes")), id=id
+        )
         user = request.user
         if request.method == "POST":
             if user == author:
@@ -256,22 +314,22 @@ class UserViewSet(DjoserUserViewSet):
                     {"errors": "Нельзя подписаться на самого себя"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            if Subscription.objects.filter(user=user, author=author).exists():
+            try:
+                Subscription.objects.create(user=user, author=author)
+            except IntegrityError:
                 return Response(
                     {"errors": "Вы уже подписаны на этого пользователя"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            Subscription.objects.create(user=user, author=author)
             serializer = self.get_serializer(author)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         elif request.method == "DELETE":
-            subscription = Subscription.objects.filter(
+            deleted, _ = Subscription.objects.filter(
                 user=user, author=author
-            ).first()
-            if not subscription:
+            ).delete()
+            if not deleted:
                 return Response(
                     {"errors": "Вы не подписаны на этого пользователя"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            subscription.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
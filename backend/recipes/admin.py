@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 from users.models import User, Subscription
 from .models import (
     Ingredient,
@@ -14,46 +15,102 @@ class UserAdmin(admin.ModelAdmin):
     list_display = ('id', 'username', 'email',
                     'recipes_count', 'followers_count', 'following_count')
     search_fields = ('username', 'email', 'first_name', 'last_name')
-    list_filter = ('is_active', 'is_staff', 'is_superuser')
+    list_filter = ('is_staff', 'is_active')
     filter_horizontal = ('groups', 'user_permissions')
     verbose_name = "Пользователь"
     verbose_name_plural = "Пользователи"
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            recipes_total=Count('recipes', distinct=True),
+            followers_total=Count('authors', distinct=True),
+            following_total=Count('followers', distinct=True),
+        ).order_by('username')
+
     def recipes_count(self, obj):
-        return obj.recipes.count()
+        return obj.recipes_total
     recipes_count.short_description = 'Рецепты'
+    recipes_count.admin_order_field = 'recipes_total'
 
     def followers_count(self, obj):
-        return obj.authors.count()
+        return obj.followers_total
     followers_count.short_description = 'Подписчики'
+    followers_count.admin_order_field = 'followers_total'
 
     def following_count(self, obj):
-        return obj.followers.count()
+        return obj.following_total
     following_count.short_description = 'Подписки'
+    following_count.admin_order_field = 'following_total'
 
 
 @admin.register(Subscription)
 class SubscriptionAdmin(admin.ModelAdmin):
     list_display = ('id', 'author', 'user')
     search_fields = ('author__username', 'user__username')
+    list_select_related = ('author', 'user')
 
 
 class RecipeIngredientInline(admin.TabularInline):
     model = RecipeIngredient
     extra = 1
+    autocomplete_fields = ('ingredient',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('ingredient')
+
+
+class CookingTimeFilter(admin.SimpleListFilter):
+    """Фильтр рецептов по времени приготовления"""
+    title = 'Время приготовления'
+    parameter_name = 'cooking_time'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('fast', 'До 15 минут'),
+            ('medium', '15–60 минут'),
+            ('long', 'Дольше часа'),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() == 'fast':
+            return queryset.filter(cooking_time__lt=15)
+        if self.value() == 'medium':
+            return queryset.filter(cooking_time__range=(15, 60))
+        if self.value() == 'long':
+            return queryset.filter(cooking_time__gt=60)
+        return queryset
 
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
     list_display = ('id', 'name', 'author', 'cooking_time',
-                    'favorites_count')
+                    'get_ingredients', 'favorites_count')
     search_fields = ('name', 'author__username')
-    list_filter = ('author',)
+    list_filter = (
+        ('author', admin.RelatedOnlyFieldListFilter),
+        CookingTimeFilter,
+    )
     inlines = (RecipeIngredientInline,)
+    list_select_related = ('author',)
+    autocomplete_fields = ('author',)
+    ordering = ('-id',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related(
+            'recipe_ingredients__ingredient'
+        ).annotate(favorites_total=Count('favorited_by'))
+
+    def get_ingredients(self, obj):
+        return ", ".join(
+            recipe_ingredient.ingredient.name
+            for recipe_ingredient in obj.recipe_ingredients.all()
+        )
+    get_ingredients.short_description = 'Ингредиенты'
 
     def favorites_count(self, obj):
-        return obj.favorited_by.count()
+        return obj.favorites_total
     favorites_count.short_description = 'В избранном'
+    favorites_count.admin_order_field = 'favorites_total'
 
 
 @admin.register(Ingredient)
@@ -61,18 +118,26 @@ class IngredientAdmin(admin.ModelAdmin):
     list_display = ('name', 'measurement_unit', 'recipes_count')
     search_fields = ('name', 'measurement_unit')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            recipes_total=Count('recipes')
+        ).order_by('name')
+
     def recipes_count(self, obj):
-        return obj.recipes.count()
+        return obj.recipes_total
     recipes_count.short_description = 'Используется в рецептах'
+    recipes_count.admin_order_field = 'recipes_total'
 
 
 @admin.register(FavoriteRecipe)
 class FavoriteRecipeAdmin(admin.ModelAdmin):
     list_display = ('user', 'recipe')
     search_fields = ('user__username', 'recipe__name')
+    list_select_related = ('user', 'recipe')
 
 
 @admin.register(ShoppingCart)
 class ShoppingCartAdmin(admin.ModelAdmin):
     list_display = ('user', 'recipe')
     search_fields = ('user__username', 'recipe__name')
+    list_select_related = ('user', 'recipe')
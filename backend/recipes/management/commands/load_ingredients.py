@@ -2,6 +2,7 @@ import json
 import os
 from django.core.management.base import BaseCommand
 from django.conf import settings
+from django.db import transaction
 from recipes.models import Ingredient
 
 
@@ -42,16 +43,20 @@ class Command(BaseCommand):
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
+    @transaction.atomic
     def _process_ingredients(self, data):
-        created_count = 0
-        for item in data:
-            _, created = Ingredient.objects.get_or_create(
-                name=item['name'],
-                measurement_unit=item['measurement_unit']
-            )
-            if created:
-                created_count += 1
-        return created_count
+        count_before = Ingredient.objects.count()
+        Ingredient.objects.bulk_create(
+            [
+                Ingredient(
+                    name=item['name'],
+                    measurement_unit=item['measurement_unit']
+                )
+                for item in data
+            ],
+            ignore_conflicts=True,
+        )
+        return Ingredient.objects.count() - count_before
 
     def _print_success_message(self, count):
         message = (
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-08-31 00:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_alter_favoriterecipe_options_alter_recipe_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ingredient',
+            name='name',
+            field=models.CharField(db_index=True, max_length=256, verbose_name='Название'),
+        ),
+    ]
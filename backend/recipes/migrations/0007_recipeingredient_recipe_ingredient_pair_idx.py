@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-08-31 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_favoriterecipe_unique_favoriterecipe_user_recipe_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipeingredient',
+            index=models.Index(fields=['recipe', 'ingredient'], name='recipe_ingredient_pair_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-08-31 00:57
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipeingredient_recipe_ingredient_pair_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='ingredient_name_upper_idx'),
+        ),
+    ]
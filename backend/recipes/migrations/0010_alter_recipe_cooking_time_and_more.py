@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-08-31 00:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_alter_recipe_options'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='cooking_time',
+            field=models.PositiveIntegerField(verbose_name='Время приготовления (мин)'),
+        ),
+        migrations.AlterField(
+            model_name='recipeingredient',
+            name='amount',
+            field=models.PositiveIntegerField(verbose_name='Количество'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipe',
+            constraint=models.CheckConstraint(condition=models.Q(('cooking_time__gte', 1)), name='recipe_cooking_time_gte_1'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipeingredient',
+            constraint=models.CheckConstraint(condition=models.Q(('amount__gte', 1)), name='recipe_ingredient_amount_gte_1'),
+        ),
+    ]
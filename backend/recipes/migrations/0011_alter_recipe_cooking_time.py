@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-08-31 00:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_alter_recipe_cooking_time_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='cooking_time',
+            field=models.PositiveSmallIntegerField(verbose_name='Время приготовления (мин)'),
+        ),
+    ]
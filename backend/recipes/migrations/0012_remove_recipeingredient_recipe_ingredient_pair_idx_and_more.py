@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-08-31 01:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_alter_recipe_cooking_time'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recipeingredient',
+            name='recipe_ingredient_pair_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='recipeingredient',
+            constraint=models.UniqueConstraint(fields=('recipe', 'ingredient'), name='unique_recipe_ingredient'),
+        ),
+    ]
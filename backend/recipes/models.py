@@ -1,18 +1,22 @@
 from django.db import models
-from django.core.validators import MinValueValidator
+from django.db.models.functions import Upper
 from users.models import User
 # Create your models here.
 
 
 class Ingredient(models.Model):
     """Модель ингредиента"""
-    name = models.CharField(verbose_name='Название', max_length=256)
+    name = models.CharField(
+        verbose_name='Название', max_length=256, db_index=True)
     measurement_unit = models.CharField(max_length=256)
 
     class Meta:
         ordering = ("name",)
         verbose_name = "ингредиент"
         verbose_name_plural = "ингредиенты"
+        indexes = [models.Index(
+            Upper("name"),
+            name="ingredient_name_upper_idx")]
         constraints = [models.UniqueConstraint(
             fields=["name", "measurement_unit"],
             name="unique_ingredient")]
@@ -39,14 +43,15 @@ class Recipe(models.Model):
         Ingredient,
         through="RecipeIngredient",
         related_name="recipes")
-    cooking_time = models.PositiveIntegerField(
-        verbose_name="Время приготовления (мин)",
-        validators=[MinValueValidator(1)])
+    cooking_time = models.PositiveSmallIntegerField(
+        verbose_name="Время приготовления (мин)")
 
     class Meta:
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
-        ordering = ["-id"]
+        constraints = [models.CheckConstraint(
+            condition=models.Q(cooking_time__gte=1),
+            name="recipe_cooking_time_gte_1")]
 
     def __str__(self):
         return self.name
@@ -64,18 +69,38 @@ class RecipeIngredient(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Ингредиент')
     amount = models.PositiveIntegerField(
-        verbose_name='Количество',
-        validators=[MinValueValidator(1)])
+        verbose_name='Количество')
 
     class Meta:
         verbose_name = "Ингредиент рецепта"
         verbose_name_plural = "Ингредиенты рецепта"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "ingredient"],
+                name="unique_recipe_ingredient"),
+            models.CheckConstraint(
+                condition=models.Q(amount__gte=1),
+                name="recipe_ingredient_amount_gte_1"),
+        ]
 
     def __str__(self):
         return f"{self.ingredient} — {self.recipe}"
 
 
-class FavoriteRecipe(models.Model):
+class UserRecipeRelation(models.Model):
+    """Абстрактная связь пользователь-рецепт"""
+
+    class Meta:
+        abstract = True
+        constraints = [models.UniqueConstraint(
+            fields=["user", "recipe"],
+            name="unique_%(class)s_user_recipe")]
+
+    def __str__(self):
+        return f"{self.user} — {self.recipe}"
+
+
+class FavoriteRecipe(UserRecipeRelation):
     """Модель избранного рецепта"""
     user = models.ForeignKey(
         User,
@@ -88,12 +113,12 @@ class FavoriteRecipe(models.Model):
         related_name='favorited_by',
         on_delete=models.CASCADE)
 
-    class Meta:
+    class Meta(UserRecipeRelation.Meta):
         verbose_name = "Избранный рецепт"
         verbose_name_plural = "Избранные рецепты"
 
 
-class ShoppingCart(models.Model):
+class ShoppingCart(UserRecipeRelation):
     """Модель списка покупок"""
     user = models.ForeignKey(
         User,
@@ -106,6 +131,6 @@ class ShoppingCart(models.Model):
         related_name='in_shopping_carts',
         on_delete=models.CASCADE)
 
-    class Meta:
+    class Meta(UserRecipeRelation.Meta):
         verbose_name = "Рецепт в списке покупок"
         verbose_name_plural = "Рецепты в списке покупок"
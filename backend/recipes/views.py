@@ -1,8 +1,10 @@
-from django.shortcuts import redirect, get_object_or_404
+from django.http import Http404
+from django.shortcuts import redirect
 from .models import Recipe
 
 
 def redirect_to_recipe(request, recipe_id):
     """Редирект на рецепт"""
-    get_object_or_404(Recipe, id=recipe_id)
+    if not Recipe.objects.filter(id=recipe_id).exists():
+        raise Http404("Рецепт не найден")
     return redirect('recipes:detail', recipe_id=recipe_id)
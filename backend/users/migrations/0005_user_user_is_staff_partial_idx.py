@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-08-31 00:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0004_alter_user_avatar'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_staff', True)), fields=['is_staff'], name='user_is_staff_partial_idx'),
+        ),
+    ]
@@ -43,6 +43,10 @@ class User(AbstractUser):
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
         ordering = ("username",)
+        indexes = [models.Index(
+            fields=["is_staff"],
+            condition=models.Q(is_staff=True),
+            name="user_is_staff_partial_idx")]
 
     def __str__(self):
         return self.username